@@ -4,13 +4,43 @@ Fetch NFL games from ESPN API - SLIM Version (<100KB output)
 Optimized for TRMNL e-ink display constraints
 """
 import requests
+import hashlib
 import json
 import os
 import random
+import time
+from collections.abc import Mapping
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain, islice, zip_longest
+from types import MappingProxyType
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from zoneinfo import ZoneInfo
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PACIFIC = ZoneInfo('America/Los_Angeles')
+
+# Shared read-only default for missing sub-objects (avoids a fresh {} per .get)
+EMPTY = MappingProxyType({})
 
 SCOREBOARD_URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
 SUMMARY_URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/summary"
+# (connect, read) seconds - a stuck ESPN endpoint must not hang the cron run
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Conditional-GET cache (response bodies + ETag/Last-Modified), keyed by URL
+CACHE_DIR = '.espn_cache'
+# A summary downloaded after the game went Final barely changes, so one this
+# fresh is used without a request (a body cached while live never is)
+FINAL_SUMMARY_MAX_AGE = 60 * 60
+# Written to docs/nfl_games.json; bump whenever its game fields change shape
+# so the template and worker can detect a payload they do not understand
+SCHEMA_VERSION = 1
 
 # Broadcaster logo lookups
 NETWORK_LOGOS = {
@@ -24,75 +54,291 @@ NETWORK_LOGOS = {
     "NFL Network": "https://upload.wikimedia.org/wikipedia/en/7/7a/NFL_Network_logo.svg",
     "Peacock": "https://upload.wikimedia.org/wikipedia/commons/d/d3/NBCUniversal_Peacock_Logo.svg",
 }
+# Casefolded lookup so "PRIME VIDEO" / "Amazon Prime Video" still find a logo
+NETWORK_LOGOS_CF = {name.casefold(): logo for name, logo in NETWORK_LOGOS.items()}
+NETWORK_LOGOS_CF['amazon prime video'] = NETWORK_LOGOS_CF['prime video']
+
+# Team fields: (output key, path within a scoreboard competitor, default)
+TEAM_FIELDS = (
+    ('id', ('team', 'id'), ''),
+    ('abbreviation', ('team', 'abbreviation'), ''),
+    ('short_name', ('team', 'shortDisplayName'), ''),
+)
+# Non-featured games drop the team id
+SLIM_TEAM_FIELDS = TEAM_FIELDS[1:]
+
+# ESPN status.type.state -> our status label
+STATUS_NAMES = {'pre': 'Scheduled', 'in': 'In Progress', 'post': 'Final'}
+
+# Top-level summary sections read by enrich_featured_game_slim
+SUMMARY_KEYS = ('boxscore', 'scoringPlays', 'drives', 'situation', 'pickcenter', 'gameInfo')
+# Before kickoff only odds and venue/weather are populated
+PREGAME_SUMMARY_KEYS = ('pickcenter', 'gameInfo')
+
+# Team stats we actually use in the template
+WANTED_STATS = (
+    'totalYards', 'netPassingYards', 'rushingYards', 'firstDowns',
+    'thirdDownEff', 'fourthDownEff', 'redZoneAttempts',
+    'turnovers', 'totalPenaltiesYards', 'possessionTime',
+)
+
+
+def convert_to_pacific(utc_time_str: str | None) -> str | None:
+    """Convert UTC time string to Pacific; anything unparseable is returned unchanged."""
+    if not isinstance(utc_time_str, str):
+        return utc_time_str
+    return _convert_to_pacific(utc_time_str)
 
 
-def convert_to_pacific(utc_time_str):
-    """Convert UTC time string to Pacific."""
+@lru_cache(maxsize=64)
+def _convert_to_pacific(utc_time_str: str) -> str:
+    iso_str = utc_time_str[:-1] + '+00:00' if utc_time_str.endswith('Z') else utc_time_str
     try:
-        from zoneinfo import ZoneInfo
-        utc_time = datetime.fromisoformat(utc_time_str.replace('Z', '+00:00'))
-        pacific = ZoneInfo('America/Los_Angeles')
-        pacific_time = utc_time.astimezone(pacific)
-        return pacific_time.strftime('%Y-%m-%d %I:%M %p %Z')
-    except:
+        pt = datetime.fromisoformat(iso_str).astimezone(PACIFIC)
+    except ValueError:
         return utc_time_str
+    # Same output as strftime('%Y-%m-%d %I:%M %p %Z') without the locale-aware formatter
+    hour12 = pt.hour % 12 or 12
+    ampm = 'AM' if pt.hour < 12 else 'PM'
+    return f"{pt.year:04d}-{pt.month:02d}-{pt.day:02d} {hour12:02d}:{pt.minute:02d} {ampm} {pt.tzname()}"
+
+
+def create_session() -> requests.Session:
+    """Build a pooled HTTP session so ESPN requests reuse connections."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+    # All requests go to one host, one at a time (the summary is only
+    # requested after the scoreboard has returned), so one kept-alive
+    # connection is enough
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry)
+    session.mount('https://', adapter)
+    return session
+
+
+def json_loads(data: bytes) -> dict | list:
+    """Decode JSON bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: dict | list, pretty: bool = False) -> bytes:
+    """Encode obj as JSON bytes - compact, or 2-space indented if pretty."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    # Emit UTF-8 rather than \u escapes, matching orjson's bytes
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def read_cached_body(body_path: str, meta_path: str) -> dict | None:
+    """Decode a cached body, dropping the cache entry if it can't be read."""
+    try:
+        with open(body_path, 'rb') as f:
+            return json_loads(f.read())
+    except (OSError, ValueError):
+        for path in (body_path, meta_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return None
 
 
-def fetch_scoreboard():
+def write_atomic(path: str, data: bytes) -> None:
+    """Write bytes to path via a temp file so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def fetch_json(session: requests.Session, url: str, keep_keys: tuple | None = None,
+               status: str | None = None, max_age: float | None = None) -> dict:
+    """GET a JSON document, revalidating against the on-disk cache.
+    
+    If keep_keys is given, only those top-level keys are returned and cached,
+    so a 304 only has to decode the part of the payload we actually use.
+    status is recorded alongside a freshly downloaded body. If max_age
+    (seconds) is given, a cached body downloaded less than that long ago
+    with the same status is returned without a request.
+    """
+    # Different projections of the same URL are cached separately
+    cache_id = f"{url}|{','.join(keep_keys)}" if keep_keys else url
+    key = hashlib.sha1(cache_id.encode()).hexdigest()
+    body_path = os.path.join(CACHE_DIR, f"{key}.json")
+    meta_path = os.path.join(CACHE_DIR, f"{key}.meta")
+    
+    meta = {}
+    if os.path.exists(body_path):
+        try:
+            with open(meta_path, 'rb') as f:
+                meta = json_loads(f.read())
+        except (OSError, ValueError):
+            meta = {}
+    
+    if (max_age is not None and meta and meta.get('status') == status
+            and time.time() - os.path.getmtime(body_path) < max_age):
+        cached = read_cached_body(body_path, meta_path)
+        if cached is not None:
+            return cached
+        meta = {}
+    
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    
+    response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304 and meta:
+        cached = read_cached_body(body_path, meta_path)
+        if cached is not None:
+            return cached
+        # The cached copy is gone or corrupt, so ask for the full body again
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    
+    data = json_loads(response.content)
+    body = response.content
+    if keep_keys:
+        data = {k: data[k] for k in keep_keys if k in data}
+        body = json_dumps(data)
+    
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        write_atomic(body_path, body)
+        write_atomic(meta_path, json_dumps({
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'status': status,
+        }))
+    
+    return data
+
+
+def fetch_scoreboard(session: requests.Session) -> dict | None:
     """Fetch current NFL scoreboard from ESPN."""
     try:
-        response = requests.get(SCOREBOARD_URL)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
+        return fetch_json(session, SCOREBOARD_URL)
+    except (requests.RequestException, OSError, ValueError) as e:
         print(f"Error fetching scoreboard: {e}")
         return None
 
 
-def fetch_game_summary(event_id):
+def fetch_game_summary(session: requests.Session, event_id: str, keep_keys: tuple = SUMMARY_KEYS,
+                       status: str | None = None) -> dict | None:
     """Fetch detailed game summary from ESPN."""
+    # Only a summary downloaded after the final whistle may skip revalidation
+    max_age = FINAL_SUMMARY_MAX_AGE if status == 'Final' else None
     try:
-        response = requests.get(f"{SUMMARY_URL}?event={event_id}")
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
+        return fetch_json(session, f"{SUMMARY_URL}?event={event_id}", keep_keys=keep_keys,
+                          status=status, max_age=max_age)
+    except (requests.RequestException, OSError, ValueError) as e:
         print(f"Error fetching game summary: {e}")
         return None
 
 
-def parse_status(status_data):
+def parse_status(status_data: Mapping) -> str:
     """Convert ESPN status to our format."""
-    state = status_data.get('type', {}).get('state', 'pre')
-    if state == 'pre':
-        return 'Scheduled'
-    elif state == 'in':
-        return 'In Progress'
-    elif state == 'post':
-        return 'Final'
-    return 'Unknown'
+    state = (status_data.get('type') or EMPTY).get('state', 'pre')
+    return STATUS_NAMES.get(state, 'Unknown')
 
 
-def parse_broadcasters(geo_broadcasts):
+def parse_broadcasters(geo_broadcasts: list) -> list:
     """Extract broadcaster info (slim)."""
-    broadcasters = []
-    seen = set()
-    for gb in geo_broadcasts:
-        name = gb.get('media', {}).get('shortName', '')
-        if name and name not in seen:
-            seen.add(name)
-            broadcasters.append({
-                'name': name,
-                'logo': NETWORK_LOGOS.get(name, '')
-            })
-    return broadcasters[:2]  # Max 2 broadcasters
-
-
-def parse_situation_from_scoreboard(situation_data):
-    """Parse live game situation (slim)."""
+    short_names = ((gb.get('media') or EMPTY).get('shortName') for gb in geo_broadcasts)
+    # dict keys dedupe while keeping ESPN's order
+    names = dict.fromkeys(name for name in short_names if isinstance(name, str) and name)
+    return [
+        {'name': name, 'logo': NETWORK_LOGOS_CF.get(name.casefold(), '')}
+        for name in islice(names, 2)  # Max 2 broadcasters
+    ]
+
+
+def total_record(records: list) -> str:
+    """Return the overall W-L summary from a competitor's records list."""
+    for record in records:
+        if record.get('type') == 'total':
+            return record.get('summary', '')
+    return ''
+
+
+def dig(data: Mapping, path: tuple, default: object) -> object:
+    """Follow path through nested dicts, returning default if any step is missing."""
+    for key in path:
+        try:
+            data = data.get(key)
+        except AttributeError:
+            return default
+        if data is None:
+            return default
+    return data
+
+
+def parse_team(competitor: Mapping, fields: tuple = TEAM_FIELDS) -> dict:
+    """Extract team identity and overall record from a scoreboard competitor."""
+    team = {key: dig(competitor, path, default) for key, path, default in fields}
+    team['record'] = total_record(competitor.get('records', []))
+    return team
+
+
+def split_competitors(competition: Mapping) -> tuple:
+    """Return the (home, away) competitor entries of a competition."""
+    by_side = {c.get('homeAway'): c for c in competition.get('competitors', [])}
+    return by_side.get('home') or EMPTY, by_side.get('away') or EMPTY
+
+
+def parse_scores(home_data: Mapping, away_data: Mapping) -> dict:
+    """Quarter-by-quarter and total scores."""
+    home_linescores = home_data.get('linescores', [])
+    away_linescores = away_data.get('linescores', [])
+    # zip_longest keeps a quarter that ESPN has only posted for one side so far
+    periods = [
+        {
+            'number': i + 1,
+            'away': {'points': int(a.get('value', 0) or 0)},
+            'home': {'points': int(h.get('value', 0) or 0)}
+        }
+        for i, (h, a) in enumerate(zip_longest(home_linescores, away_linescores, fillvalue=EMPTY))
+    ]
+    return {
+        'periods': periods,
+        'total': {
+            'away': int(away_data.get('score', 0) or 0),
+            'home': int(home_data.get('score', 0) or 0),
+        }
+    }
+
+
+def pregame_scores() -> dict:
+    """Scores for a game that hasn't kicked off: no periods, zero totals."""
+    return {'periods': [], 'total': {'away': 0, 'home': 0}}
+
+
+def _build_situation(situation_data: dict | None, include_yards: bool) -> dict | None:
+    """Shared builder for scoreboard and summary situations (slim)."""
     if not situation_data:
         return None
     
-    last_play = situation_data.get('lastPlay', {})
+    last_play = situation_data.get('lastPlay') or EMPTY
+    if last_play:
+        try:
+            play_type = last_play['type']['text']
+        except (KeyError, TypeError):
+            play_type = ''
+        last_play_out = {
+            'text': last_play.get('text', ''),
+            'type': play_type,
+        }
+        if include_yards:
+            last_play_out['yards'] = last_play.get('statYardage', 0)
+    else:
+        last_play_out = None
     
     return {
         'down': situation_data.get('down', 0),
@@ -103,49 +349,34 @@ def parse_situation_from_scoreboard(situation_data):
         'is_red_zone': situation_data.get('isRedZone', False),
         'home_timeouts': situation_data.get('homeTimeouts', 3),
         'away_timeouts': situation_data.get('awayTimeouts', 3),
-        'last_play': {
-            'text': last_play.get('text', ''),
-            'type': last_play.get('type', {}).get('text', '') if isinstance(last_play.get('type'), dict) else '',
-        } if last_play else None
+        'last_play': last_play_out,
     }
 
 
-def parse_game(event_data):
+def parse_situation_from_scoreboard(situation_data: dict | None) -> dict | None:
+    """Parse live game situation (slim)."""
+    return _build_situation(situation_data, include_yards=False)
+
+
+def parse_game(event_data: dict) -> dict:
     """Parse ESPN event data into slim format."""
     competition = event_data.get('competitions', [{}])[0]
-    competitors = competition.get('competitors', [])
-    
-    home_data = next((c for c in competitors if c.get('homeAway') == 'home'), {})
-    away_data = next((c for c in competitors if c.get('homeAway') == 'away'), {})
+    home_data, away_data = split_competitors(competition)
     
-    home_team_info = home_data.get('team', {})
-    away_team_info = away_data.get('team', {})
-    
-    home_score = int(home_data.get('score', 0) or 0)
-    away_score = int(away_data.get('score', 0) or 0)
-    
-    home_records = home_data.get('records', [])
-    away_records = away_data.get('records', [])
-    home_record = next((r.get('summary', '') for r in home_records if r.get('type') == 'total'), '')
-    away_record = next((r.get('summary', '') for r in away_records if r.get('type') == 'total'), '')
-    
-    status_data = competition.get('status', {})
+    status_data = competition.get('status') or EMPTY
     status = parse_status(status_data)
     
-    # Quarter scores
-    periods = []
-    home_linescores = home_data.get('linescores', [])
-    away_linescores = away_data.get('linescores', [])
-    for i, (h, a) in enumerate(zip(home_linescores, away_linescores)):
-        periods.append({
-            'number': i + 1,
-            'away': {'points': int(a.get('value', 0))},
-            'home': {'points': int(h.get('value', 0))}
-        })
-    
+    # Scheduled games have no linescores or situation to walk
     situation = None
-    if status == 'In Progress':
-        situation = parse_situation_from_scoreboard(competition.get('situation'))
+    if status == 'Scheduled':
+        scores = pregame_scores()
+    else:
+        scores = parse_scores(home_data, away_data)
+        if status == 'In Progress':
+            situation = parse_situation_from_scoreboard(competition.get('situation'))
+    
+    season = event_data.get('season') or EMPTY
+    week = event_data.get('week') or EMPTY
     
     game = {
         'id': event_data.get('id', ''),
@@ -154,26 +385,13 @@ def parse_game(event_data):
         'start_time_pacific': convert_to_pacific(event_data.get('date', '')),
         'short_name': event_data.get('shortName', ''),
         'season': {
-            'type_name': 'Postseason' if event_data.get('season', {}).get('type') == 3 else 'Regular Season',
-            'week': event_data.get('week', {}).get('number', 0)
-        },
-        'away_team': {
-            'id': away_team_info.get('id', ''),
-            'abbreviation': away_team_info.get('abbreviation', ''),
-            'short_name': away_team_info.get('shortDisplayName', ''),
-            'record': away_record,
-        },
-        'home_team': {
-            'id': home_team_info.get('id', ''),
-            'abbreviation': home_team_info.get('abbreviation', ''),
-            'short_name': home_team_info.get('shortDisplayName', ''),
-            'record': home_record,
+            'type_name': 'Postseason' if season.get('type') == 3 else 'Regular Season',
+            'week': week.get('number', 0)
         },
+        'away_team': parse_team(away_data),
+        'home_team': parse_team(home_data),
         'broadcasters': parse_broadcasters(competition.get('geoBroadcasts', [])),
-        'scores': {
-            'periods': periods,
-            'total': {'away': away_score, 'home': home_score}
-        },
+        'scores': scores,
         'clock': status_data.get('displayClock', '0:00'),
         'period': status_data.get('period', 0),
         'situation': situation
@@ -182,47 +400,60 @@ def parse_game(event_data):
     return game
 
 
+def parse_game_slim(event_data: dict) -> dict:
+    """Parse only what a non-featured game shows, plus the keys rank_games needs.
+    
+    Produces the slim_other_game() shape with 'id' and 'start_time_utc' added;
+    the featured game is re-parsed in full with parse_game() after ranking.
+    """
+    competition = event_data.get('competitions', [{}])[0]
+    home_data, away_data = split_competitors(competition)
+    status_data = competition.get('status') or EMPTY
+    status = parse_status(status_data)
+    
+    return {
+        'id': event_data.get('id', ''),
+        'status': status,
+        'start_time_utc': event_data.get('date', ''),
+        'start_time_pacific': convert_to_pacific(event_data.get('date', '')),
+        'away_team': parse_team(away_data, SLIM_TEAM_FIELDS),
+        'home_team': parse_team(home_data, SLIM_TEAM_FIELDS),
+        'scores': pregame_scores() if status == 'Scheduled' else parse_scores(home_data, away_data),
+        'clock': status_data.get('displayClock', '0:00'),
+        'period': status_data.get('period', 0),
+    }
+
+
 # ============================================================================
 # SLIM DATA EXTRACTION FROM SUMMARY ENDPOINT
 # ============================================================================
 
-def parse_slim_team_stats(boxscore):
+def parse_slim_team_stats(boxscore: dict) -> dict:
     """Parse team stats - VALUES ONLY (no labels/descriptions)."""
     teams = boxscore.get('teams', [])
     stats = {'away': {}, 'home': {}}
     
-    # Stats we actually use in the template
-    WANTED_STATS = [
-        'totalYards', 'netPassingYards', 'rushingYards', 'firstDowns',
-        'thirdDownEff', 'fourthDownEff', 'redZoneAttempts',
-        'turnovers', 'totalPenaltiesYards', 'possessionTime'
-    ]
-    
     for team_data in teams:
         side = team_data.get('homeAway', '')
-        if side not in ['home', 'away']:
+        if side not in stats:
             continue
         
+        # Index the team's stats once, then pick the wanted ones out of it
         team_stats = team_data.get('statistics', [])
-        parsed = {}
-        
-        for stat in team_stats:
-            stat_name = stat.get('name', '')
-            if stat_name in WANTED_STATS:
-                parsed[stat_name] = stat.get('displayValue', '0')
+        by_name = {stat.get('name', ''): stat.get('displayValue', '0') for stat in team_stats}
         
-        stats[side] = parsed
+        stats[side] = {name: by_name[name] for name in WANTED_STATS if name in by_name}
     
     return stats
 
 
-def parse_slim_scoring_plays(scoring_plays):
+def parse_slim_scoring_plays(scoring_plays: list) -> list:
     """Parse scoring plays - SLIM format."""
     plays = []
     for play in scoring_plays:
-        team = play.get('team', {})
-        clock = play.get('clock', {})
-        period = play.get('period', {})
+        team = play.get('team') or EMPTY
+        clock = play.get('clock') or EMPTY
+        period = play.get('period') or EMPTY
         
         plays.append({
             'period': period.get('number', 0),
@@ -235,12 +466,12 @@ def parse_slim_scoring_plays(scoring_plays):
     return plays
 
 
-def parse_slim_drive(drive):
+def parse_slim_drive(drive: dict) -> dict:
     """Parse a single drive with SLIM plays."""
     plays = []
     for play in drive.get('plays', []):
-        play_type = play.get('type', {})
-        end_info = play.get('end', {})
+        play_type = play.get('type') or EMPTY
+        end_info = play.get('end') or EMPTY
         
         # Only keep essential play info
         plays.append({
@@ -252,7 +483,7 @@ def parse_slim_drive(drive):
             'end_pos': end_info.get('possessionText', ''),
         })
     
-    team = drive.get('team', {})
+    team = drive.get('team') or EMPTY
     
     return {
         'id': drive.get('id', ''),
@@ -265,7 +496,7 @@ def parse_slim_drive(drive):
     }
 
 
-def parse_slim_drives(drives_data, num_drives=2):
+def parse_slim_drives(drives_data: dict | None, num_drives: int = 2) -> dict | None:
     """Parse only the last N drives (chronologically)."""
     if not drives_data:
         return None
@@ -287,47 +518,29 @@ def parse_slim_drives(drives_data, num_drives=2):
     return result
 
 
-def parse_slim_situation(situation_data):
+def parse_slim_situation(situation_data: dict | None) -> dict | None:
     """Parse live game situation - SLIM format."""
-    if not situation_data:
-        return None
-    
-    last_play = situation_data.get('lastPlay', {})
-    lp_end = last_play.get('end', {}) if last_play else {}
-    
-    return {
-        'down': situation_data.get('down', 0),
-        'distance': situation_data.get('distance', 0),
-        'yard_line': situation_data.get('yardLine', 0),
-        'down_distance_text': situation_data.get('downDistanceText', ''),
-        'possession': situation_data.get('possession', ''),
-        'is_red_zone': situation_data.get('isRedZone', False),
-        'home_timeouts': situation_data.get('homeTimeouts', 3),
-        'away_timeouts': situation_data.get('awayTimeouts', 3),
-        'last_play': {
-            'text': last_play.get('text', ''),
-            'type': last_play.get('type', {}).get('text', '') if isinstance(last_play.get('type'), dict) else '',
-            'yards': last_play.get('statYardage', 0),
-        } if last_play else None
-    }
+    return _build_situation(situation_data, include_yards=True)
 
 
-def parse_slim_odds(pickcenter):
+def parse_slim_odds(pickcenter: list | None) -> dict | None:
     """Extract just the essential betting info."""
     if not pickcenter:
         return None
     
-    pc = pickcenter[0] if pickcenter else {}
+    pc = pickcenter[0]
+    home_odds = pc.get('homeTeamOdds') or EMPTY
+    away_odds = pc.get('awayTeamOdds') or EMPTY
     
     return {
         'spread': pc.get('details', ''),
         'over_under': pc.get('overUnder', 0),
-        'home_ml': pc.get('homeTeamOdds', {}).get('moneyLine', 0),
-        'away_ml': pc.get('awayTeamOdds', {}).get('moneyLine', 0),
+        'home_ml': home_odds.get('moneyLine', 0),
+        'away_ml': away_odds.get('moneyLine', 0),
     }
 
 
-def parse_slim_weather(game_info):
+def parse_slim_weather(game_info: dict | None) -> dict | None:
     """Extract essential weather info."""
     if not game_info:
         return None
@@ -343,7 +556,7 @@ def parse_slim_weather(game_info):
     }
 
 
-def parse_slim_venue(game_info):
+def parse_slim_venue(game_info: dict | None) -> dict | None:
     """Extract essential venue info."""
     if not game_info:
         return None
@@ -351,43 +564,53 @@ def parse_slim_venue(game_info):
     venue = game_info.get('venue', {})
     if not venue:
         return None
+    address = venue.get('address') or EMPTY
     
     return {
         'name': venue.get('fullName', ''),
-        'city': venue.get('address', {}).get('city', ''),
-        'state': venue.get('address', {}).get('state', ''),
+        'city': address.get('city', ''),
+        'state': address.get('state', ''),
     }
 
 
-def enrich_featured_game_slim(game, summary):
-    """Add SLIM detailed data to featured game."""
-    if not summary:
-        return game
-    
-    # Team stats - values only
-    boxscore = summary.get('boxscore', {})
-    game['stats'] = parse_slim_team_stats(boxscore)
-    
-    # Scoring plays - slim
-    game['scoring_plays'] = parse_slim_scoring_plays(summary.get('scoringPlays', []))
-    
-    # Only last 2 drives
-    game['drives'] = parse_slim_drives(summary.get('drives'), num_drives=2)
+def parse_summary_fields(summary: dict, status: str) -> dict:
+    """Featured-game fields parsed from a summary, ready to merge into the game."""
+    game_info = summary.get('gameInfo')
     
-    # Full situation (needed for live display)
-    summary_situation = parse_slim_situation(summary.get('situation'))
-    if summary_situation:
-        game['situation'] = summary_situation
-    
-    # Slim odds
-    game['odds'] = parse_slim_odds(summary.get('pickcenter'))
+    if status == 'Scheduled':
+        # No box score, scoring plays or drives exist before kickoff
+        fields = {'stats': {'away': {}, 'home': {}}, 'scoring_plays': [], 'drives': None}
+    else:
+        fields = {
+            # Team stats - values only
+            'stats': parse_slim_team_stats(summary.get('boxscore', {})),
+            # Scoring plays - slim
+            'scoring_plays': parse_slim_scoring_plays(summary.get('scoringPlays', [])),
+            # Only last 2 drives
+            'drives': parse_slim_drives(summary.get('drives'), num_drives=2),
+        }
+        
+        # Full situation (needed for live display); otherwise keep the scoreboard one
+        summary_situation = parse_slim_situation(summary.get('situation'))
+        if summary_situation:
+            fields['situation'] = summary_situation
     
-    # Slim weather
-    game['weather'] = parse_slim_weather(summary.get('gameInfo'))
+    fields.update({
+        'odds': parse_slim_odds(summary.get('pickcenter')),
+        'weather': parse_slim_weather(game_info),
+        'venue': parse_slim_venue(game_info),
+    })
     
-    # Slim venue
-    game['venue'] = parse_slim_venue(summary.get('gameInfo'))
+    return fields
+
+
+def enrich_featured_game_slim(game: dict, summary: dict | None) -> dict:
+    """Add SLIM detailed data to featured game."""
+    if not summary:
+        return game
     
+    # Featured game is only used through all_games, so fill it in place
+    game.update(parse_summary_fields(summary, game['status']))
     return game
 
 
@@ -395,20 +618,22 @@ def enrich_featured_game_slim(game, summary):
 # SLIM OUTPUT FOR NON-FEATURED GAMES
 # ============================================================================
 
-def slim_other_game(game):
+def slim_other_game(game: dict) -> dict:
     """Minimal data for non-featured games."""
+    away = game.get('away_team') or EMPTY
+    home = game.get('home_team') or EMPTY
     return {
         'status': game.get('status', ''),
         'start_time_pacific': game.get('start_time_pacific', ''),
         'away_team': {
-            'abbreviation': game.get('away_team', {}).get('abbreviation', ''),
-            'short_name': game.get('away_team', {}).get('short_name', ''),
-            'record': game.get('away_team', {}).get('record', ''),
+            'abbreviation': away.get('abbreviation', ''),
+            'short_name': away.get('short_name', ''),
+            'record': away.get('record', ''),
         },
         'home_team': {
-            'abbreviation': game.get('home_team', {}).get('abbreviation', ''),
-            'short_name': game.get('home_team', {}).get('short_name', ''),
-            'record': game.get('home_team', {}).get('record', ''),
+            'abbreviation': home.get('abbreviation', ''),
+            'short_name': home.get('short_name', ''),
+            'record': home.get('record', ''),
         },
         'scores': game.get('scores', {}),
         'clock': game.get('clock', ''),
@@ -416,112 +641,118 @@ def slim_other_game(game):
     }
 
 
-def rank_games(games):
+def rank_games(games: list) -> list:
     """Rank games: In Progress first, then Final, then Scheduled."""
-    in_progress = [g for g in games if g['status'] == 'In Progress']
-    final = [g for g in games if g['status'] == 'Final']
-    scheduled = [g for g in games if g['status'] == 'Scheduled']
-    
-    if in_progress:
-        featured = random.choice(in_progress)
-        in_progress.remove(featured)
-        in_progress = [featured] + in_progress
-    elif final:
-        featured = random.choice(final)
-        final.remove(featured)
-        final = [featured] + final
-    
-    scheduled.sort(key=lambda g: g['start_time_utc'])
-    
-    ranked = in_progress + final + scheduled
-    for i, game in enumerate(ranked):
-        game['display_rank'] = i + 1
+    # Bucket by status in a single pass; games in any other status are dropped
+    in_progress, final, scheduled = [], [], []
+    buckets = {'In Progress': in_progress, 'Final': final, 'Scheduled': scheduled}
+    for g in games:
+        bucket = buckets.get(g['status'])
+        if bucket is not None:
+            bucket.append(g)
+    
+    # Feature a random live game (or a random final one) by swapping it to the front
+    featured_bucket = in_progress or final
+    if featured_bucket:
+        idx = random.randrange(len(featured_bucket))
+        featured_bucket[0], featured_bucket[idx] = featured_bucket[idx], featured_bucket[0]
+    
+    # A null kickoff sorts first rather than failing the str comparison
+    scheduled.sort(key=lambda g: g['start_time_utc'] or '')
+    
+    ranked = [*chain(in_progress, final, scheduled)]
+    for i, game in enumerate(ranked, 1):
+        game['display_rank'] = i
     
     return ranked
 
 
-def main():
+def main() -> None:
     print("=" * 60)
     print("NFL ESPN API - SLIM Fetcher (<100KB)")
     print("=" * 60)
     
-    # Fetch scoreboard
-    print("Fetching NFL scoreboard...")
-    scoreboard = fetch_scoreboard()
-    
-    if not scoreboard:
-        print("Failed to fetch scoreboard")
-        return
-    
-    # Parse all games
-    events = scoreboard.get('events', [])
-    print(f"Found {len(events)} games")
-    
-    all_games = []
-    for event in events:
-        game = parse_game(event)
-        all_games.append(game)
-    
-    # Rank games
-    all_games = rank_games(all_games)
-    
-    print(f"\nGames ranked:")
-    for g in all_games:
-        print(f"  {g['display_rank']}. {g['away_team']['abbreviation']} @ {g['home_team']['abbreviation']} ({g['status']})")
-    
-    # Enrich #1 ranked game with SLIM data
-    if all_games:
-        rank1_game = all_games[0]
-        print(f"\nFetching SLIM summary for: {rank1_game['short_name']}...")
+    with create_session() as session:
+        # Fetch scoreboard
+        print("Fetching NFL scoreboard...")
+        scoreboard = fetch_scoreboard(session)
         
-        summary = fetch_game_summary(rank1_game['id'])
+        if not scoreboard:
+            print("Failed to fetch scoreboard")
+            return
         
-        if summary:
-            enrich_featured_game_slim(rank1_game, summary)
-            print("  ✓ Loaded slim stats")
-            print("  ✓ Loaded scoring plays")
-            print("  ✓ Loaded last 2 drives")
-            if (rank1_game.get('drives') or {}).get('recent'):
-                print(f"    - {len(rank1_game['drives']['recent'])} recent drives")
-        else:
-            print("  Could not load summary")
+        # Parse all games
+        events = scoreboard.get('events', [])
+        print(f"Found {len(events)} games")
+        
+        all_games = [parse_game_slim(event) for event in events]
+        
+        # Rank games
+        all_games = rank_games(all_games)
+        
+        print(f"\nGames ranked:")
+        for g in all_games:
+            print(f"  {g['display_rank']}. {g['away_team']['abbreviation']} @ {g['home_team']['abbreviation']} ({g['status']})")
+        
+        # Enrich #1 ranked game with SLIM data
+        if all_games:
+            # Only the featured game needs the full parse
+            rank1_id = all_games[0]['id']
+            rank1_game = parse_game(next(e for e in events if e.get('id', '') == rank1_id))
+            rank1_game['display_rank'] = 1
+            all_games[0] = rank1_game
+            print(f"\nFetching SLIM summary for: {rank1_game['short_name']}...")
+            
+            keep_keys = PREGAME_SUMMARY_KEYS if rank1_game['status'] == 'Scheduled' else SUMMARY_KEYS
+            summary = fetch_game_summary(session, rank1_game['id'], keep_keys, rank1_game['status'])
+            
+            if summary:
+                enrich_featured_game_slim(rank1_game, summary)
+                print("  ✓ Loaded slim stats")
+                print("  ✓ Loaded scoring plays")
+                print("  ✓ Loaded last 2 drives")
+                if (rank1_game.get('drives') or {}).get('recent'):
+                    print(f"    - {len(rank1_game['drives']['recent'])} recent drives")
+            else:
+                print("  Could not load summary")
     
     # Get season info
+    season = scoreboard.get('season') or EMPTY
+    week = scoreboard.get('week') or EMPTY
     season_info = {
-        'year': scoreboard.get('season', {}).get('year', 0),
-        'type_name': 'Postseason' if scoreboard.get('season', {}).get('type') == 3 else 'Regular Season',
-        'week': scoreboard.get('week', {}).get('number', 0)
+        'year': season.get('year', 0),
+        'type_name': 'Postseason' if season.get('type') == 3 else 'Regular Season',
+        'week': week.get('number', 0)
     }
     
     # Build output - featured game is first, others are slimmed
-    output_games = []
-    for i, game in enumerate(all_games[:4]):
-        if i == 0:
-            output_games.append(game)
-        else:
-            output_games.append(slim_other_game(game))
+    output_games = all_games[:1] + [slim_other_game(game) for game in all_games[1:4]]
     
     # Save to JSON
     os.makedirs('docs', exist_ok=True)
     output = {
+        'schema_version': SCHEMA_VERSION,
         'fetched_at': datetime.now().isoformat(),
         'season': season_info,
         'games': output_games
     }
     
     # Compact version only
-    with open('docs/nfl_games.json', 'w') as f:
-        json.dump(output, f, separators=(',', ':'))
-    
-    # Also save pretty version for debugging
-    with open('docs/nfl_games_debug.json', 'w') as f:
-        json.dump(output, f, indent=2)
+    payload = json_dumps(output)
+    with open('docs/nfl_games.json', 'wb') as f:
+        f.write(payload)
     
     # Report sizes
-    compact_size = os.path.getsize('docs/nfl_games.json')
-    debug_size = os.path.getsize('docs/nfl_games_debug.json')
+    compact_size = len(payload)
     print(f"\nSaved to docs/nfl_games.json ({compact_size:,} bytes / {compact_size/1024:.1f} KB)")
-    print(f"Debug version: docs/nfl_games_debug.json ({debug_size:,} bytes / {debug_size/1024:.1f} KB)")
+    
+    # Pretty version for debugging, only when asked for (NFL_DEBUG_JSON=1)
+    if os.environ.get('NFL_DEBUG_JSON'):
+        debug_payload = json_dumps(output, pretty=True)
+        with open('docs/nfl_games_debug.json', 'wb') as f:
+            f.write(debug_payload)
+        debug_size = len(debug_payload)
+        print(f"Debug version: docs/nfl_games_debug.json ({debug_size:,} bytes / {debug_size/1024:.1f} KB)")
     
     if compact_size > 100000:
         print(f"⚠️  WARNING: Output exceeds 100KB limit!")